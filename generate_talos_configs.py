@@ -7,25 +7,90 @@ generate_talos_configs.py  –  Talos 1.10 static-IP generator
 * After bootstrap is complete, the configs should be regenerated with VIP as the endpoint.
 * Patches each node with a static address, gateway, nameserver.
 * Adds the same `vip.ip` block to **every** control-plane node (per Talos docs).
-* Deep-copy guarantees no cross-node bleed-over.
-* Each YAML is validated with `talosctl validate --mode=metal`.
+* Each node is patched on its own decoded JSON snapshot, so there is no cross-node bleed-over.
+* Each YAML is validated with `talosctl validate --mode=metal` (concurrently),
+  skipping files unchanged since their last successful validation.
 * Creates an insecure talosconfig to help with bootstrapping.
+* An `--ha-phase` re-run reuses the bootstrap run's base configs (and secrets)
+  when the cluster inputs are unchanged, only switching the endpoint.
 """
 
 from __future__ import annotations
 
 import argparse
-import copy
+import hashlib
+import json
+import math
+import os
+import re
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
+from urllib.parse import urlsplit
 
 import yaml
 
+try:  # libyaml-backed parser/emitter when available
+    from yaml import CSafeDumper as _Dumper, CSafeLoader as _Loader
+except ImportError:  # pure-Python fallback
+    from yaml import SafeDumper as _Dumper, SafeLoader as _Loader
+
+try:  # orjson for the per-node template snapshot when available
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:  # stdlib fallback
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
 IFNAME_DEFAULT = "ens18"
 DISK_DEFAULT = "/dev/vda"
+VALIDATED_DIR = ".validated"  # per-output-dir cache of passed validations
+GEN_MANIFEST = ".gen-manifest"  # hash of the inputs the base configs were generated from
+BASE_FILES = ("controlplane.yaml", "worker.yaml", "talosconfig", "talosconfig.insecure")
+
+# Shared by every node; patch_node copies these into a fresh list per config.
+# QEMU guest agent extension for Proxmox integration
+_EXTENSIONS = ({"image": "ghcr.io/siderolabs/qemu-guest-agent:9.2.0"},)
+# Kernel args for predictable network interface naming
+_EXTRA_KARGS = ("net.ifnames=0",)
+_CCM_MANIFESTS = (
+    "https://raw.githubusercontent.com/siderolabs/talos-cloud-controller-manager/main/docs/deploy/cloud-controller-manager.yml",
+    "https://raw.githubusercontent.com/alex1989hu/kubelet-serving-cert-approver/main/deploy/standalone-install.yaml",
+)
+
+# argparse dest -> (environment variable, default)
+_ENV_DEFAULTS = {
+    "cluster_name": ("TALOS_CONFIG_CLUSTER_NAME", "my-k8s-cluster"),
+    "endpoint": ("TALOS_CONFIG_ENDPOINT", None),
+    "vip": ("TALOS_CONFIG_NETWORK_VIP", None),
+    "control_planes": ("TALOS_CONFIG_CONTROL_PLANES", None),
+    "workers": ("TALOS_CONFIG_WORKERS", None),
+    "gateway": ("TALOS_CONFIG_NETWORK_GATEWAY", None),
+    "nameserver": ("TALOS_CONFIG_NETWORK_DNS", "1.1.1.1"),
+    "talos_version": ("TALOS_CONFIG_VERSION", "v1.10.2"),
+    "cidr": ("TALOS_CONFIG_NETWORK_CIDR", "24"),
+    "ifname": ("TALOS_CONFIG_NETWORK_INTERFACE", IFNAME_DEFAULT),
+    "disk": ("TALOS_CONFIG_VM_DISK", DISK_DEFAULT),
+    "out": ("TALOS_CONFIG_OUTPUT_DIR", "./output"),
+}
+# argparse dest -> environment variable; any non-empty value switches it on
+_ENV_FLAGS = {
+    "bootstrap_phase": "TALOS_CONFIG_BOOTSTRAP_PHASE",
+    "ha_phase": "TALOS_CONFIG_HA_PHASE",
+    "enable_ccm": "TALOS_CONFIG_ENABLE_CCM",
+}
+
+# stands in for the node IP when a role's config is rendered once (see _render_nodes)
+_NODE_IP_PLACEHOLDER = "NODE-IP-PLACEHOLDER"
+
+_STR_TAG = "tag:yaml.org,2002:str"
+_resolver = yaml.resolver.Resolver()
 
 
 # --------------------------------------------------------------------------- #
@@ -36,43 +101,143 @@ def sh(cmd: List[str], **kw):
     try:
         subprocess.run(cmd, check=True, **kw)
     except subprocess.CalledProcessError as exc:
+        if exc.stderr:
+            # stderr was captured by the caller; surface it only on failure
+            sys.stderr.write(exc.stderr.decode(errors="replace"))
         print(f"✗ Command failed: {' '.join(cmd)}", file=sys.stderr)
         sys.exit(exc.returncode)
 
 
 def yaml_load(p: Path) -> dict:
     with p.open() as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_Loader)
+
+
+def _yaml_scalar(v) -> str:
+    """Render a scalar as plain YAML where that round-trips, else quoted."""
+    if v is None:
+        return "null"
+    if v is True:
+        return "true"
+    if v is False:
+        return "false"
+    if isinstance(v, int):
+        return str(v)
+    if isinstance(v, float):
+        if math.isnan(v):
+            return ".nan"
+        if math.isinf(v):
+            return ".inf" if v > 0 else "-.inf"
+        text = repr(v)
+        # YAML 1.1 floats need a dot, e.g. 1e+20 -> 1.0e+20
+        if "." not in text and "e" in text:
+            text = text.replace("e", ".0e", 1)
+        return text
+    s = str(v)
+    if not s.isprintable():
+        # JSON string escapes are valid YAML double-quoted scalars
+        return json.dumps(s)
+    if (
+        not s
+        or s[0] in "-?:,[]{}#&*!|>'\"%@` "
+        or s[-1] in ": "
+        or ": " in s
+        or " #" in s
+        or _resolver.resolve(yaml.ScalarNode, s, (True, False)) != _STR_TAG
+    ):
+        return "'" + s.replace("'", "''") + "'"
+    return s
+
+
+def _yaml_block(data, indent: int, out: List[str]):
+    """Append block-style lines for *data* (mapping or sequence) to *out*."""
+    pad = " " * indent
+    if isinstance(data, dict):
+        for k, v in data.items():
+            key = _yaml_scalar(k)
+            if isinstance(v, dict) and v:
+                out.append(f"{pad}{key}:\n")
+                _yaml_block(v, indent + 2, out)
+            elif isinstance(v, list) and v:
+                # sequences sit at the parent key's indent, like PyYAML
+                out.append(f"{pad}{key}:\n")
+                _yaml_block(v, indent, out)
+            else:
+                out.append(f"{pad}{key}: {_yaml_flow(v)}\n")
+    else:
+        for item in data:
+            if isinstance(item, (dict, list)) and item:
+                start = len(out)
+                _yaml_block(item, indent + 2, out)
+                # hoist the first nested line onto the "- " marker
+                out[start] = f"{pad}- {out[start][indent + 2:]}"
+            else:
+                out.append(f"{pad}- {_yaml_flow(item)}\n")
+
+
+def _yaml_flow(v) -> str:
+    if isinstance(v, dict):
+        return "{}"
+    if isinstance(v, list):
+        return "[]"
+    return _yaml_scalar(v)
+
+
+def _write_bytes_fast(p: Path, buf: bytes):
+    """Write *buf* to *p* through a raw fd, bypassing Python's io stack."""
+    fd = os.open(p, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(buf)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _fast_yaml_dump(data) -> str:
+    """
+    Return *data* as block-style YAML without PyYAML's event/representer
+    machinery.  Only handles the plain dict/list/scalar trees Talos uses.
+    """
+    out: List[str] = []
+    if isinstance(data, (dict, list)) and data:
+        _yaml_block(data, 0, out)
+    else:
+        out.append(f"{_yaml_flow(data)}\n")
+    return "".join(out)
+
+
+def yaml_render(data: dict, *, slow: bool = False) -> str:
+    """Return *data* as YAML text; *slow* selects PyYAML's emitter for comparison."""
+    if slow:
+        return yaml.dump(data, Dumper=_Dumper, sort_keys=False)
+    return _fast_yaml_dump(data)
 
 
-def yaml_dump(data: dict, p: Path):
-    with p.open("w") as f:
-        yaml.safe_dump(data, f, sort_keys=False)
+def yaml_dump(data: dict, p: Path, *, slow: bool = False):
+    """Write *data* to *p*; *slow* selects PyYAML's emitter for comparison."""
+    # Render in memory and write once; streaming into a text file makes the
+    # emitter issue one small write() per token.
+    _write_bytes_fast(p, yaml_render(data, slow=slow).encode("utf-8"))
 
 
 # --------------------------------------------------------------------------- #
 # talos-specific bits                                                         #
 # --------------------------------------------------------------------------- #
-def gen_base_configs(a, out: Path, bootstrap_phase: bool = True):
+def gen_base_configs(a, out: Path, bootstrap_phase: bool = True, reuse: bool = False):
     """
     Call `talosctl gen config …` writing results to *out*.
     During initial bootstrap, we use the first CP node's IP as the endpoint,
-    otherwise we use the VIP for HA.
+    otherwise we use the VIP for HA.  With *reuse*, the base configs already
+    in *out* (see `base_configs_reusable`) are kept and only re-pointed at
+    the new endpoint, so the cluster secrets stay the same.
     """
-    # --- build endpoint & SAN list -----------------------------------------
-    if bootstrap_phase and a.vip:
-        # During bootstrap, use the first CP node's IP as endpoint to avoid chicken-egg problem
-        # (VIP won't exist until after cluster is bootstrapped)
-        endpoint_url = f"https://{a.control_planes[0]}:6443"
-    else:
-        # After bootstrap, we can use the VIP as the endpoint for HA
-        endpoint_url = f"https://{a.vip}:6443" if a.vip else f"https://{a.endpoint}"
+    endpoint_url = _endpoint_url(a, bootstrap_phase)
 
-    sans: list[str] = []
-    if a.vip:
-        sans.append(a.vip)
-    sans.extend(a.control_planes)
-    sans = list(dict.fromkeys(sans))  # de-dupe, keep order
+    if reuse:
+        # Secrets and SANs are unchanged since the last run; only the endpoint moves.
+        _set_endpoint(out, endpoint_url)
+        return
 
     cmd = [
         "talosctl",
@@ -82,6 +247,51 @@ def gen_base_configs(a, out: Path, bootstrap_phase: bool = True):
         endpoint_url,
         "--output-dir",
         str(out),
+        *_gen_options(a),
+    ]
+
+    sh(cmd, stdout=subprocess.DEVNULL)
+
+    # Modify talosconfig to make it insecure for easier bootstrapping
+    talosconfig_path = out / "talosconfig"
+    if talosconfig_path.exists():
+        # Set insecure: true for handling x509 certificate issues during bootstrap
+        text = _mark_contexts_insecure(talosconfig_path.read_text())
+        if text is not None:
+            buf = text.encode("utf-8")
+            _write_bytes_fast(talosconfig_path, buf)
+            # Create an explicitly named insecure copy for reference
+            _write_bytes_fast(out / "talosconfig.insecure", buf)
+        else:
+            # unexpected layout: fall back to a full parse and re-emit
+            config = yaml_load(talosconfig_path)
+            for context_name in config.get("contexts", {}):
+                config["contexts"][context_name]["insecure"] = True
+            slow = getattr(a, "slow_dump", False)
+            yaml_dump(config, talosconfig_path, slow=slow)
+            yaml_dump(config, out / "talosconfig.insecure", slow=slow)
+
+    _write_bytes_fast(out / GEN_MANIFEST, _gen_manifest(a).encode())
+
+
+def _endpoint_url(a, bootstrap_phase: bool) -> str:
+    if bootstrap_phase and a.vip:
+        # During bootstrap, use the first CP node's IP as endpoint to avoid chicken-egg problem
+        # (VIP won't exist until after cluster is bootstrapped)
+        return f"https://{a.control_planes[0]}:6443"
+    # After bootstrap, we can use the VIP as the endpoint for HA
+    return f"https://{a.vip}:6443" if a.vip else f"https://{a.endpoint}"
+
+
+def _cert_sans(a) -> List[str]:
+    # de-dupe, keep order (the VIP or a repeated CSV entry may collide)
+    return list(dict.fromkeys([a.vip, *a.control_planes] if a.vip else a.control_planes))
+
+
+def _gen_options(a) -> List[str]:
+    """`talosctl gen config` arguments other than the endpoint and output dir."""
+    sans = _cert_sans(a)
+    opts = [
         "--talos-version",
         a.talos_version,
         "--with-cluster-discovery",  # Enable cluster discovery for better node joining
@@ -89,25 +299,100 @@ def gen_base_configs(a, out: Path, bootstrap_phase: bool = True):
         "--with-secrets",            # Generate secrets
         "--force",
     ]
-    for san in sans:
-        cmd += ["--additional-sans", san]
+    opts.extend(chain.from_iterable(("--additional-sans", san) for san in sans))
+    return opts
 
-    sh(cmd, stdout=subprocess.DEVNULL)
 
-    # Modify talosconfig to make it insecure for easier bootstrapping
-    talosconfig_path = out / "talosconfig"
-    if talosconfig_path.exists():
-        config = yaml_load(talosconfig_path)
-        # Set insecure: true for handling x509 certificate issues during bootstrap
-        for context_name in config.get("contexts", {}):
-            config["contexts"][context_name]["insecure"] = True
-        yaml_dump(config, talosconfig_path)
-        # Create an explicitly named insecure copy for reference
-        yaml_dump(config, out / "talosconfig.insecure")
+def _gen_manifest(a) -> str:
+    """Hash of every `talosctl gen config` input except the endpoint."""
+    blob = json.dumps([a.cluster_name, *_gen_options(a)]).encode()
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+def base_configs_reusable(a, out: Path, endpoint_url: str) -> bool:
+    """
+    True if *out* holds base configs generated from the same inputs as *a*
+    that can simply be re-pointed at *endpoint_url*.
+    """
+    # talosctl also puts the endpoint host into the API server's certSANs, so
+    # only an endpoint already covered by --additional-sans (in practice the
+    # VIP) can be switched to without regenerating the certificates.
+    if urlsplit(endpoint_url).hostname not in _cert_sans(a):
+        return False
+    try:
+        if (out / GEN_MANIFEST).read_text() != _gen_manifest(a):
+            return False
+    except OSError:
+        return False
+    return all((out / name).exists() for name in BASE_FILES)
+
+
+def _set_endpoint(out: Path, endpoint_url: str):
+    """Point the base templates' cluster.controlPlane.endpoint at *endpoint_url*."""
+    for name in ("controlplane.yaml", "worker.yaml"):
+        p = out / name
+        text, n = re.subn(
+            r"^( *controlPlane:\n +endpoint: )\S+",
+            lambda m: m.group(1) + endpoint_url,
+            p.read_text(),
+            count=1,
+            flags=re.M,
+        )
+        if n:
+            _write_bytes_fast(p, text.encode("utf-8"))
+        else:
+            # unexpected layout: fall back to a full parse and re-emit
+            cfg = yaml_load(p)
+            cfg["cluster"]["controlPlane"]["endpoint"] = endpoint_url
+            yaml_dump(cfg, p)
+
+
+def _mark_contexts_insecure(text: str) -> str | None:
+    """
+    Add `insecure: true` to every context of a block-style talosconfig
+    without a YAML round-trip.  Returns None if the layout isn't recognised.
+    """
+    if not text.endswith("\n"):
+        text += "\n"
+    m = re.search(r"^contexts:[ \t]*\n( +)\S[^\n]*\n( +)\S", text, re.M)
+    if m is None or len(m.group(2)) <= len(m.group(1)):
+        return None
+    ctx_pad, body_pad = m.group(1), m.group(2)
+    flag = re.compile(rf"^{body_pad}insecure:[^\n]*\n", re.M)
+
+    def mark(block: re.Match) -> str:
+        body = block.group(0)
+        if flag.search(body):
+            return flag.sub(f"{body_pad}insecure: true\n", body)
+        return f"{body}{body_pad}insecure: true\n"
+
+    # only touch the contexts block: from `contexts:` to the next top-level key
+    start = text.index("\n", m.start()) + 1
+    nxt = re.compile(r"^[^\s#]", re.M).search(text, start)
+    end = nxt.start() if nxt else len(text)
+
+    # a context is its name line plus every following line at the body indent
+    block = re.sub(
+        rf"^{ctx_pad}[^\s#][^\n]*:[ \t]*\n(?:{body_pad}[^\n]*\n)+",
+        mark,
+        text[start:end],
+        flags=re.M,
+    )
+    return text[:start] + block + text[end:]
+
+
+def _deep_merge(dst: dict, src: dict):
+    """Merge *src* into *dst* in place, recursing only where both sides are dicts."""
+    for k, v in src.items():
+        cur = dst.get(k)
+        if isinstance(v, dict) and isinstance(cur, dict):
+            _deep_merge(cur, v)
+        else:
+            dst[k] = v
 
 
 def patch_node(
-    base: dict,
+    base_json: bytes,
     *,
     ip: str,
     cidr: str,
@@ -118,23 +403,15 @@ def patch_node(
     vip: str | None = None,
     enable_ccm: bool = False,
 ) -> dict:
-    """Return a deep-copied, per-node-patched machine config."""
-    cfg = copy.deepcopy(base)
+    """
+    Return a per-node-patched machine config.
 
-    # ---------------- install target ----------------
-    install_config = cfg.setdefault("machine", {}).setdefault("install", {})
-    install_config["disk"] = disk
-    
-    # Add QEMU guest agent extension for Proxmox integration
-    install_config["extensions"] = [
-        {"image": "ghcr.io/siderolabs/qemu-guest-agent:9.2.0"}
-    ]
-    
-    # Add kernel args for predictable network interface naming
-    install_config["extraKernelArgs"] = ["net.ifnames=0"]
+    *base_json* is the template serialised with `_json_dumps`; decoding it
+    gives each node a fully independent tree far more cheaply than
+    `copy.deepcopy`.
+    """
+    cfg = _json_loads(base_json)
 
-    # ---------------- network interface -------------
-    mnet = cfg["machine"].setdefault("network", {})
     iface = {
         "interface": ifname,
         "dhcp": False,
@@ -143,121 +420,181 @@ def patch_node(
     }
     if vip:
         iface["vip"] = {"ip": vip}
-    mnet["interfaces"] = [iface]
-    mnet["nameservers"] = [ns]
-    
-    # Configure kubelet for proper integration
-    kubelet = cfg["machine"].setdefault("kubelet", {})
-    kubelet.setdefault("extraArgs", {})
-    
-    # Configure certificate rotation for enhanced security
-    kubelet["extraArgs"]["rotate-server-certificates"] = "true"
-    
+
+    overlay = {
+        "machine": {
+            # ---------------- install target ----------------
+            "install": {
+                "disk": disk,
+                "extensions": list(_EXTENSIONS),
+                "extraKernelArgs": list(_EXTRA_KARGS),
+            },
+            # ---------------- network interface -------------
+            "network": {"interfaces": [iface], "nameservers": [ns]},
+            # Configure certificate rotation for enhanced security
+            "kubelet": {"extraArgs": {"rotate-server-certificates": "true"}},
+        },
+    }
+
     # Enable cloud provider if requested
     if enable_ccm:
-        kubelet["extraArgs"]["cloud-provider"] = "external"
-        
+        machine = overlay["machine"]
+        machine["kubelet"]["extraArgs"]["cloud-provider"] = "external"
+
         # Enable features for Talos API access (needed for CCM)
-        features = cfg["machine"].setdefault("features", {})
-        features["kubernetesTalosAPIAccess"] = {
-            "enabled": True,
-            "allowedRoles": ["os:reader"],
-            "allowedKubernetesNamespaces": ["kube-system"]
+        machine["features"] = {
+            "kubernetesTalosAPIAccess": {
+                "enabled": True,
+                "allowedRoles": ["os:reader"],
+                "allowedKubernetesNamespaces": ["kube-system"]
+            }
         }
-        
+
         # For control planes, enable external cloud provider
         if cfg.get("cluster", {}).get("controlPlane", {}):
-            cluster = cfg.setdefault("cluster", {})
-            cluster["externalCloudProvider"] = {
-                "enabled": True,
-                "manifests": [
-                    "https://raw.githubusercontent.com/siderolabs/talos-cloud-controller-manager/main/docs/deploy/cloud-controller-manager.yml",
-                    "https://raw.githubusercontent.com/alex1989hu/kubelet-serving-cert-approver/main/deploy/standalone-install.yaml"
-                ]
+            overlay["cluster"] = {
+                "externalCloudProvider": {
+                    "enabled": True,
+                    "manifests": list(_CCM_MANIFESTS),
+                }
             }
 
+    _deep_merge(cfg, overlay)
     return cfg
 
 
-def validate_files(paths: Iterable[Path]):
-    """Schema-validate each machine-config file."""
-    for p in paths:
-        sh(
-            ["talosctl", "validate", "--mode=metal", "--config", str(p)],
-            stdout=subprocess.PIPE,
-        )
+def _talosctl_fingerprint() -> bytes:
+    """Identify the installed talosctl so an upgrade invalidates cached results."""
+    exe = shutil.which("talosctl")
+    if exe is None:
+        return b""
+    st = os.stat(exe)
+    return f"{exe}:{st.st_mtime_ns}:{st.st_size}".encode()
 
 
-def create_node_configs(a, out: Path):
-    cp_tpl = yaml_load(out / "controlplane.yaml")
-    wk_tpl = yaml_load(out / "worker.yaml")
-
-    generated: list[Path] = []
-
-    # -------- control planes --------
-    for i, ip in enumerate(a.control_planes, 1):
-        out_file = out / f"cp{i}.yaml"
-        yaml_dump(
-            patch_node(
-                cp_tpl,
-                ip=ip,
-                cidr=a.cidr,
-                gw=a.gateway,
-                ns=a.nameserver,
-                ifname=a.ifname,
-                disk=a.disk,
-                vip=a.vip,         # <-- VIP on *every* CP node
-                enable_ccm=getattr(a, "enable_ccm", False),
-            ),
-            out_file,
-        )
-        generated.append(out_file)
-
-    # -------- workers ---------------
-    for i, ip in enumerate(a.workers, 1):
-        out_file = out / f"w{i}.yaml"
-        yaml_dump(
-            patch_node(
-                wk_tpl,
-                ip=ip,
-                cidr=a.cidr,
-                gw=a.gateway,
-                ns=a.nameserver,
-                ifname=a.ifname,
-                disk=a.disk,
-                enable_ccm=getattr(a, "enable_ccm", False),
-            ),
-            out_file,
-        )
-        generated.append(out_file)
+def _validate_one(p: Path, digest: str):
+    sh(
+        ["talosctl", "validate", "--mode=metal", "--config", str(p)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    _write_bytes_fast(p.parent / VALIDATED_DIR / f"{p.name}.b2b", digest.encode())
 
-    validate_files(generated)
+
+def validate_files(paths: Iterable[Path], max_workers: int | None = None):
+    """
+    Schema-validate each machine-config file, all files concurrently.
+
+    Each file is submitted as soon as *paths* yields it, so a lazy iterable
+    lets talosctl start on early files while later ones are still written.
+    A file whose content hash matches its sidecar in `.validated/` passed
+    validation on an earlier run and is skipped.
+    """
+    # `talosctl validate` takes a single --config, has no batch or stdin/server
+    # mode, and concatenating configs into one stream is rejected as duplicate
+    # v1alpha1 documents, so one process per file is unavoidable.  The threads
+    # just wait on talosctl (GIL released), so the N process startups overlap
+    # and N validations take about as long as one.  A failing check exits via
+    # sh() and surfaces here.
+    fingerprint = _talosctl_fingerprint()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        jobs = []
+        for p in paths:
+            digest = hashlib.blake2b(p.read_bytes() + fingerprint, digest_size=16).hexdigest()
+            sidecar = p.parent / VALIDATED_DIR / f"{p.name}.b2b"
+            try:
+                if sidecar.read_text() == digest:
+                    continue
+            except OSError:
+                pass
+            sidecar.parent.mkdir(exist_ok=True)
+            jobs.append(pool.submit(_validate_one, p, digest))
+        for job in jobs:
+            job.result()
+
+
+def _clear_output_dir(out: Path, keep: Iterable[str] = ()):
+    """Empty *out* for regeneration, keeping the validation cache and *keep*."""
+    keep = {VALIDATED_DIR, *keep}
+    # The directory is normally flat, so unlink straight off the scandir
+    # entries (their d_type spares a stat each) and only fall back to
+    # shutil.rmtree for an unexpected subdirectory.
+    with os.scandir(out) as entries:
+        for entry in entries:
+            if entry.name in keep:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+
+
+def _render_nodes(patch, ips: List[str], cidr: str, slow: bool) -> List[str]:
+    """
+    Render one machine-config document per IP for a single node role.
+
+    Nodes of a role differ only in their address, so the role is patched and
+    emitted once with a placeholder IP and each node's text is spliced from
+    that rendering.  Nodes whose address would need YAML quoting (e.g. IPv6)
+    and --slow-dump runs go through the full patch+dump path instead.
+    """
+    pieces = [] if slow else yaml_render(patch(ip=_NODE_IP_PLACEHOLDER)).split(_NODE_IP_PLACEHOLDER)
+    texts = []
+    for ip in ips:
+        address = f"{ip}/{cidr}"
+        if len(pieces) != 2 or _yaml_scalar(address) != address:
+            texts.append(yaml_render(patch(ip=ip), slow=slow))
+        else:
+            texts.append(ip.join(pieces))
+    return texts
+
+
+def create_node_configs(a, out: Path):
+    # Talos configs are plain str/int/bool/list/dict trees, so a JSON snapshot
+    # round-trips losslessly and is decoded once per node.
+    cp_tpl_json = _json_dumps(yaml_load(out / "controlplane.yaml"))
+    wk_tpl_json = _json_dumps(yaml_load(out / "worker.yaml"))
+
+    slow = getattr(a, "slow_dump", False)
+
+    # Network/disk settings are shared by every node; bind them once.
+    shared = partial(
+        patch_node,
+        cidr=a.cidr,
+        gw=a.gateway,
+        ns=a.nameserver,
+        ifname=a.ifname,
+        disk=a.disk,
+        enable_ccm=getattr(a, "enable_ccm", False),
+    )
+    cp_patch = partial(shared, cp_tpl_json, vip=a.vip)  # <-- VIP on *every* CP node
+    wk_patch = partial(shared, wk_tpl_json)
+
+    def generated() -> Iterator[Path]:
+        # -------- control planes --------
+        for i, text in enumerate(_render_nodes(cp_patch, a.control_planes, a.cidr, slow), 1):
+            out_file = out / f"cp{i}.yaml"
+            _write_bytes_fast(out_file, text.encode("utf-8"))
+            yield out_file
+
+        # -------- workers ---------------
+        for i, text in enumerate(_render_nodes(wk_patch, a.workers, a.cidr, slow), 1):
+            out_file = out / f"w{i}.yaml"
+            _write_bytes_fast(out_file, text.encode("utf-8"))
+            yield out_file
+
+    # validation of each file starts as soon as it has been written
+    validate_files(generated(), max_workers=len(a.control_planes) + len(a.workers) or None)
 
 
 # --------------------------------------------------------------------------- #
 # CLI                                                                         #
 # --------------------------------------------------------------------------- #
 def main():
-    import os
-    
     # Set default values from environment variables or use defaults
-    env_defaults = {
-        "cluster_name": os.environ.get("TALOS_CONFIG_CLUSTER_NAME", "my-k8s-cluster"),
-        "endpoint": os.environ.get("TALOS_CONFIG_ENDPOINT", None),
-        "vip": os.environ.get("TALOS_CONFIG_NETWORK_VIP", None),
-        "control_planes": os.environ.get("TALOS_CONFIG_CONTROL_PLANES", None),
-        "workers": os.environ.get("TALOS_CONFIG_WORKERS", None),
-        "gateway": os.environ.get("TALOS_CONFIG_NETWORK_GATEWAY", None),
-        "nameserver": os.environ.get("TALOS_CONFIG_NETWORK_DNS", "1.1.1.1"),
-        "talos_version": os.environ.get("TALOS_CONFIG_VERSION", "v1.10.2"),
-        "cidr": os.environ.get("TALOS_CONFIG_NETWORK_CIDR", "24"),
-        "ifname": os.environ.get("TALOS_CONFIG_NETWORK_INTERFACE", IFNAME_DEFAULT),
-        "disk": os.environ.get("TALOS_CONFIG_VM_DISK", DISK_DEFAULT),
-        "out": os.environ.get("TALOS_CONFIG_OUTPUT_DIR", "./output"),
-        "bootstrap_phase": os.environ.get("TALOS_CONFIG_BOOTSTRAP_PHASE", "") != "",
-        "ha_phase": os.environ.get("TALOS_CONFIG_HA_PHASE", "") != "",
-        "enable_ccm": os.environ.get("TALOS_CONFIG_ENABLE_CCM", "") != "",
-    }
+    env = os.environ
+    env_defaults = {k: env.get(var, default) for k, (var, default) in _ENV_DEFAULTS.items()}
+    env_defaults.update((k, env.get(var, "") != "") for k, var in _ENV_FLAGS.items())
     
     ap = argparse.ArgumentParser(description="Generate Talos 1.10 machine configs")
     ap.add_argument("--cluster-name", default=env_defaults["cluster_name"],
@@ -292,6 +629,8 @@ def main():
                     help="Generate configs for HA operation after bootstrap (uses VIP as endpoint)")
     ap.add_argument("--enable-ccm", action="store_true", default=env_defaults["enable_ccm"],
                     help="Enable Cloud Controller Manager for Talos (recommended for Proxmox)")
+    ap.add_argument("--slow-dump", action="store_true",
+                    help="Emit YAML with PyYAML instead of the built-in writer (for cross-checking)")
     a = ap.parse_args()
     
     # Validate required arguments
@@ -301,14 +640,27 @@ def main():
     if missing_args:
         ap.error(f"the following arguments are required: {', '.join('--' + arg for arg in missing_args)}")
 
+    # ---------- split CSV args ------
+    a.control_planes = [s.strip() for s in a.control_planes.split(",") if s.strip()]
+    a.workers = [s.strip() for s in a.workers.split(",") if s.strip()]
+
+    # Default to bootstrap phase if neither is specified
+    bootstrap_phase = a.bootstrap_phase or not a.ha_phase
+
     # ---------- output dir ----------
     out = Path(a.out).expanduser().resolve()
+    # The HA re-run keeps the bootstrap run's base configs (and secrets) when
+    # nothing but the endpoint has changed.
+    reuse = False
     if out.exists():
         if not a.force:
             print(f"✗ {out} exists (use --force)", file=sys.stderr)
             sys.exit(1)
+        reuse = not bootstrap_phase and base_configs_reusable(
+            a, out, _endpoint_url(a, bootstrap_phase)
+        )
         try:
-            shutil.rmtree(out)
+            _clear_output_dir(out, keep=(GEN_MANIFEST, *BASE_FILES) if reuse else ())
         except OSError as e:
             print(f"Warning: Could not remove {out}: {e}. Will attempt to continue anyway.")
     try:
@@ -316,78 +668,82 @@ def main():
     except OSError as e:
         print(f"Warning: Could not create {out}: {e}. Will attempt to continue anyway.")
 
-    # ---------- split CSV args ------
-    a.control_planes = [s.strip() for s in a.control_planes.split(",") if s.strip()]
-    a.workers = [s.strip() for s in a.workers.split(",") if s.strip()]
-
-    # Default to bootstrap phase if neither is specified
-    bootstrap_phase = a.bootstrap_phase or not a.ha_phase
-
-    gen_base_configs(a, out, bootstrap_phase=bootstrap_phase)
+    if reuse:
+        print(f"↺ Reusing base configs in {out} (unchanged inputs, same cluster secrets)")
+    gen_base_configs(a, out, bootstrap_phase=bootstrap_phase, reuse=reuse)
     create_node_configs(a, out)
 
     # ---------- done ----------------
-    print(f"✓ Talos configs written to {out}\n")
     cp_paths = " ".join(str(out / f"cp{i}.yaml") for i in range(1, len(a.control_planes) + 1))
     
     # Add CCM status to output
     ccm_status = "ENABLED" if getattr(a, "enable_ccm", False) else "DISABLED"
     
+    # Collect the report as lines and emit it with one write.  Each node group
+    # is a single entry, so an empty group still leaves its line break.
+    lines: list[str] = [f"✓ Talos configs written to {out}", ""]
     if bootstrap_phase:
-        print(
-            "BOOTSTRAP PHASE: Initial cluster creation\n"
-            "=======================================\n"
-            f"Talos Cloud Controller Manager (CCM): {ccm_status}\n\n"
-            "1. Configure talosctl to talk to node IPs (not the VIP)\n"
-            f"   export TALOSCONFIG={out}/talosconfig.insecure\n"
-            f"   talosctl config endpoint {' '.join(a.control_planes)}\n\n"
-            "2. Push control-plane configs\n"
-            + "\n".join(
-                f"   talosctl apply-config --insecure --nodes {ip} --file {out / f'cp{idx}.yaml'}"
-                for idx, ip in enumerate(a.control_planes, 1)
-            )
-            + "\n\n3. ⚠️ CRITICAL: Remove ISO and force disk-only boot with UEFI support (prevents x509 certificate issues)\n"
-            f"   ./talos_vm_manager.sh remove_iso\n\n"
-            "4. Bootstrap once (target first CP node's *real* IP)\n"
-            f"   talosctl bootstrap --insecure --nodes {a.control_planes[0]}\n\n"
-            "5. Wait 60-120 seconds for etcd to initialize\n\n"
-            "6. Push worker configs\n"
-            + "\n".join(
-                f"   talosctl apply-config --insecure --nodes {ip} --file {out / f'w{idx}.yaml'}"
-                for idx, ip in enumerate(a.workers, 1)
-            )
-            + "\n\n7. Verify cluster status\n"
-            f"   talosctl health --insecure --nodes {a.control_planes[0]}\n"
-            f"   talosctl kubeconfig --insecure --nodes {a.control_planes[0]} -e {a.control_planes[0]}\n\n"
-            "8. After successful bootstrap, regenerate configs with --ha-phase\n"
-            f"   python3 {sys.argv[0]} --ha-phase --enable-ccm [other args...]\n\n"
-            "9. Apply the new configs to switch to VIP-based HA:\n"
-            + "\n".join(
-                f"   talosctl apply-config --nodes {ip} --file {out / f'cp{idx}.yaml'}"
-                for idx, ip in enumerate(a.control_planes, 1)
-            )
-            + "\n"
-            + "\n".join(
-                f"   talosctl apply-config --nodes {ip} --file {out / f'w{idx}.yaml'}"
-                for idx, ip in enumerate(a.workers, 1)
-            )
-        )
+        lines += [
+            "BOOTSTRAP PHASE: Initial cluster creation",
+            "=======================================",
+            f"Talos Cloud Controller Manager (CCM): {ccm_status}",
+            "",
+            "1. Configure talosctl to talk to node IPs (not the VIP)",
+            f"   export TALOSCONFIG={out}/talosconfig.insecure",
+            f"   talosctl config endpoint {' '.join(a.control_planes)}",
+            "",
+            "2. Push control-plane configs",
+        ]
+        lines.append("\n".join(
+            f"   talosctl apply-config --insecure --nodes {ip} --file {out / f'cp{idx}.yaml'}"
+            for idx, ip in enumerate(a.control_planes, 1)
+        ))
+        lines += [
+            "",
+            "3. ⚠️ CRITICAL: Remove ISO and force disk-only boot with UEFI support (prevents x509 certificate issues)",
+            "   ./talos_vm_manager.sh remove_iso",
+            "",
+            "4. Bootstrap once (target first CP node's *real* IP)",
+            f"   talosctl bootstrap --insecure --nodes {a.control_planes[0]}",
+            "",
+            "5. Wait 60-120 seconds for etcd to initialize",
+            "",
+            "6. Push worker configs",
+        ]
+        lines.append("\n".join(
+            f"   talosctl apply-config --insecure --nodes {ip} --file {out / f'w{idx}.yaml'}"
+            for idx, ip in enumerate(a.workers, 1)
+        ))
+        lines += [
+            "",
+            "7. Verify cluster status",
+            f"   talosctl health --insecure --nodes {a.control_planes[0]}",
+            f"   talosctl kubeconfig --insecure --nodes {a.control_planes[0]} -e {a.control_planes[0]}",
+            "",
+            "8. After successful bootstrap, regenerate configs with --ha-phase",
+            f"   python3 {sys.argv[0]} --ha-phase --enable-ccm [other args...]",
+            "",
+            "9. Apply the new configs to switch to VIP-based HA:",
+        ]
+        indent = "   "
     else:
-        print(
-            "HA PHASE: Post-bootstrap configuration\n"
-            "====================================\n"
-            f"Talos Cloud Controller Manager (CCM): {ccm_status}\n\n"
-            "Apply these configs to switch to VIP-based HA:\n"
-            + "\n".join(
-                f"talosctl apply-config --nodes {ip} --file {out / f'cp{idx}.yaml'}"
-                for idx, ip in enumerate(a.control_planes, 1)
-            )
-            + "\n"
-            + "\n".join(
-                f"talosctl apply-config --nodes {ip} --file {out / f'w{idx}.yaml'}"
-                for idx, ip in enumerate(a.workers, 1)
-            )
-        )
+        lines += [
+            "HA PHASE: Post-bootstrap configuration",
+            "====================================",
+            f"Talos Cloud Controller Manager (CCM): {ccm_status}",
+            "",
+            "Apply these configs to switch to VIP-based HA:",
+        ]
+        indent = ""
+    lines.append("\n".join(
+        f"{indent}talosctl apply-config --nodes {ip} --file {out / f'cp{idx}.yaml'}"
+        for idx, ip in enumerate(a.control_planes, 1)
+    ))
+    lines.append("\n".join(
+        f"{indent}talosctl apply-config --nodes {ip} --file {out / f'w{idx}.yaml'}"
+        for idx, ip in enumerate(a.workers, 1)
+    ))
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":